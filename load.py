@@ -1,22 +1,189 @@
 import io
 import json
+import codecs
+import csv
 import os
 import hashlib
+import importlib.util
+import shutil
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from typing import Dict, List, Optional, Union
 from datetime import datetime, timedelta
 from pathlib import Path
 import pandas as pd
 import geopandas as gpd
 from google.oauth2 import service_account
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaIoBaseDownload, build_http, set_user_agent
 from dotenv import load_dotenv
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow é opcional: sem ele, usa o leitor CSV do pandas
+    pa = None
+    pc = None
+    pacsv = None
+    pq = None
+
+try:
+    from google.auth.transport.requests import AuthorizedSession
+except ImportError:  # requer o pacote requests; sem ele, baixa via MediaIoBaseDownload
+    AuthorizedSession = None
+
+try:
+    import orjson
+except ImportError:  # opcional: sem ele, usa o json da biblioteca padrão
+    orjson = None
+
+try:
+    import charset_normalizer
+except ImportError:  # opcional: sem ele, testa utf-8 e depois latin-1
+    charset_normalizer = None
+
+# Leituras do pandas com colunas Arrow (pandas >= 2.0) quando o pyarrow está disponível
+DTYPE_BACKEND = {'dtype_backend': 'pyarrow'} if pa is not None else {}
+# Calamine (Rust) é bem mais rápido que openpyxl/xlrd; o pandas só o aceita a partir da 2.2
+EXCEL_ENGINE = (
+    {'engine': 'calamine'}
+    if importlib.util.find_spec('python_calamine') is not None
+    and tuple(int(part) for part in pd.__version__.split('.')[:2]) >= (2, 2)
+    else {}
+)
+#############################################################
+FOLDER_MIME = 'application/vnd.google-apps.folder'
+SHEET_MIME = 'application/vnd.google-apps.spreadsheet'
+SUPPORTED_EXTENSIONS = ['csv', 'xlsx', 'xls', 'json', 'geojson']
+CSV_SEPARATORS = [";", ",", "|"]
+CSV_ENCODINGS = ["utf-8", "latin-1"]
+# Palpites do charset_normalizer aceitos (outros, como cp1250, corrompem acentos em português)
+CSV_DETECTED_ENCODINGS = CSV_ENCODINGS + ["cp1252"]
+CSV_SAMPLE_SIZE = 32 * 1024
+DOWNLOAD_CHUNK_SIZE = 64 << 20
+DOWNLOAD_URL = "https://www.googleapis.com/drive/v3/files/{file_id}?alt=media&supportsAllDrives=true"
+DOWNLOAD_WORKERS = 4
+# (conexão, leitura) em segundos: um download travado não bloqueia get_tables para sempre
+DOWNLOAD_TIMEOUT = (10, 300)
+# As APIs do Google só comprimem a resposta se o User-Agent contiver "gzip"
+USER_AGENT = 'editais2025 (gzip)'
+# Validade do cache é decidida pelo modifiedTime; este prazo só descarta entradas abandonadas
+CACHE_MAX_AGE = timedelta(hours=24)
+# Listas JSON acima deste tamanho são convertidas via Arrow em vez de json_normalize
+JSON_ARROW_MIN_RECORDS = 10_000
+# Colunas de texto com menos valores distintos que esta fração viram category
+CATEGORY_MAX_RATIO = 0.5
+#############################################################
+class LazyTable:
+    """
+    Proxy de uma tabela do warehouse: só baixa e lê o arquivo no primeiro
+    acesso a um atributo do DataFrame (ou em collect()).
+    Atributos, indexação, iteração e operadores são delegados ao DataFrame;
+    para um DataFrame de verdade (isinstance, pd.DataFrame(...), pickle) use collect().
+    """
+    
+    _SLOTS = ('_warehouse', '_name', '_file_info', '_sheet_name', '_df', '_loaded')
+    
+    def __init__(self, warehouse: 'GDriveWarehouse', name: str, file_info: Dict, sheet_name: Union[str, int, None] = None):
+        self._warehouse = warehouse
+        self._name = name
+        self._file_info = file_info
+        self._sheet_name = sheet_name
+        self._df = None
+        self._loaded = False
+    
+    def collect(self) -> Optional[Union[pd.DataFrame, gpd.GeoDataFrame]]:
+        """Materializa a tabela (usa o cache do warehouse) e retorna o DataFrame."""
+        if not self._loaded:
+            self._df = self._warehouse._load_table(
+                self._name, self._file_info, sheet_name=self._sheet_name
+            )
+            self._loaded = True
+        return self._df
+    
+    def _require(self) -> Union[pd.DataFrame, gpd.GeoDataFrame]:
+        """Como collect(), mas levanta erro se a tabela não pôde ser carregada."""
+        df = self.collect()
+        if df is None:
+            raise ValueError(f"Tabela '{self._name}' não pôde ser carregada")
+        return df
+    
+    def __getattr__(self, attr: str):
+        # Atributos especiais (copy, pickle...) e os do próprio proxy não disparam o download
+        if attr.startswith('__') or attr in LazyTable._SLOTS:
+            raise AttributeError(attr)
+        return getattr(self._require(), attr)
+    
+    def __setattr__(self, attr: str, value):
+        # lazy.columns = [...] altera o DataFrame, não o proxy
+        if attr in LazyTable._SLOTS:
+            object.__setattr__(self, attr, value)
+        else:
+            setattr(self._require(), attr, value)
+    
+    def __reduce__(self):
+        # copy/pickle recriam o proxy sem carregar a tabela
+        return (LazyTable, (self._warehouse, self._name, self._file_info, self._sheet_name))
+    
+    def __getitem__(self, key):
+        return self._require()[key]
+    
+    def __setitem__(self, key, value):
+        self._require()[key] = value
+    
+    def __delitem__(self, key):
+        del self._require()[key]
+    
+    def __iter__(self):
+        return iter(self._require())
+    
+    def __contains__(self, key) -> bool:
+        return key in self._require()
+    
+    def __len__(self) -> int:
+        return len(self._require())
+    
+    def __array__(self, *args, **kwargs):
+        return self._require().__array__(*args, **kwargs)
+    
+    def __repr__(self) -> str:
+        if self._df is None:
+            return f"LazyTable('{self._name}', não carregada)"
+        return repr(self._df)
+
+
+def _lazy_delegate(op: str):
+    """Cria um operador de LazyTable que delega ao DataFrame carregado."""
+    def method(self, *args):
+        args = [arg._require() if type(arg) is LazyTable else arg for arg in args]
+        return getattr(self._require(), op)(*args)
+    method.__name__ = op
+    return method
+
+
+# Comparações, aritmética e bool delegam ao DataFrame
+for _op in [
+    '__eq__', '__ne__', '__lt__', '__le__', '__gt__', '__ge__',
+    '__add__', '__radd__', '__sub__', '__rsub__', '__mul__', '__rmul__',
+    '__truediv__', '__rtruediv__', '__floordiv__', '__rfloordiv__',
+    '__mod__', '__rmod__', '__pow__', '__rpow__',
+    '__and__', '__rand__', '__or__', '__ror__', '__xor__', '__rxor__',
+    '__neg__', '__pos__', '__abs__', '__invert__', '__bool__',
+]:
+    setattr(LazyTable, _op, _lazy_delegate(_op))
+LazyTable.__hash__ = None  # como o DataFrame, não é hasheável (define __eq__)
 #############################################################
 class GDriveWarehouse:
     """
     Data Warehouse usando Google Drive como storage.
     Suporta CSV, Excel (XLSX/XLS), JSON e Google Sheets.
-    Cache em memória com lazy loading (só baixa quando necessário).
+    Cache em memória com lazy loading (só baixa quando necessário),
+    mais um cache em disco (Parquet) que sobrevive entre execuções.
     """
     
     def __init__(
@@ -25,15 +192,20 @@ class GDriveWarehouse:
         credentials_path: Optional[str] = None,
         cache_ttl_minutes: int = 30,
         sheet_name: Union[str, int] = 0,
-        load_env: bool = True
+        load_env: bool = True,
+        max_workers: int = 16,
+        disk_cache_dir: Optional[str] = None
     ):
         """
         Args:
             folder_id: ID da pasta raiz no Google Drive (ou define via GDRIVE_FOLDER_ID no .env)
             credentials_path: Caminho para credentials.json (ou define via GDRIVE_CREDENTIALS_PATH no .env)
-            cache_ttl_minutes: Tempo de vida do cache em minutos
+            cache_ttl_minutes: Tempo de vida do índice de arquivos (e dos modifiedTime) em minutos
             sheet_name: Nome ou índice da aba do Excel (0 = primeira aba, padrão)
             load_env: Se True, carrega variáveis do arquivo .env
+            max_workers: Número máximo de requisições simultâneas ao Drive na indexação
+            disk_cache_dir: Pasta do cache em disco (ou define via GDRIVE_CACHE_DIR no .env;
+                padrão: ~/.cache/gdrive_warehouse). Requer pyarrow.
         """
         # Carrega variáveis de ambiente
         if load_env:
@@ -58,6 +230,19 @@ class GDriveWarehouse:
         
         self.cache_ttl = timedelta(minutes=cache_ttl_minutes)
         self.sheet_name = sheet_name
+        self.max_workers = max_workers
+        
+        # Cache em disco (Parquet); desativado sem pyarrow
+        self.disk_cache_dir = None
+        if pa is not None:
+            cache_dir = Path(
+                disk_cache_dir or os.getenv('GDRIVE_CACHE_DIR') or '~/.cache/gdrive_warehouse'
+            ).expanduser()
+            try:
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                self.disk_cache_dir = cache_dir
+            except OSError as e:
+                print(f"  Aviso: Cache em disco desativado ({cache_dir}): {e}")
         
         # Autenticação
         SCOPES = [
@@ -69,22 +254,36 @@ class GDriveWarehouse:
             creds = service_account.Credentials.from_service_account_file(
                 credentials_path, scopes=SCOPES
             )
-            self.drive_service = build('drive', 'v3', credentials=creds)
-            self.sheets_service = build('sheets', 'v4', credentials=creds)
+            self._creds = creds
+            self.drive_service = build('drive', 'v3', http=self._new_http(), static_discovery=True)
+            self.sheets_service = build('sheets', 'v4', http=self._new_http(), static_discovery=True)
             print("✓ Autenticação realizada com sucesso")
         except Exception as e:
             raise Exception(f"Erro ao autenticar com Google: {str(e)}")
         
         # Cache em memória
-        self._cache = {}  # {file_id: {'df': DataFrame, 'timestamp': datetime, ...}}
+        self._cache = {}  # {cache_key: {'df': pa.Table ou DataFrame, 'timestamp': datetime, ...}}
         self._file_index = None  # {nome_tabela: file_info}
         self._file_index_timestamp = None
+        self._modified_times = {}  # {file_id: modifiedTime} (preenchido na indexação)
+        self._local = threading.local()  # httplib2.Http não é thread-safe: um por thread
+        self._sheet_meta_cache = {}  # {file_id: {'modified_time': str, 'titles': [abas]}}
+        self._is_shared_drive = None  # descoberto na primeira indexação
+        
+        # Single-flight: uma indexação por vez e uma leitura por arquivo/aba
+        self._index_lock = threading.RLock()
+        self._file_locks = {}  # {cache_key: [threading.Lock, nº de threads usando]}
+        self._file_locks_guard = threading.Lock()
         
         # Metadados
         self.metadata = {}
     
     def _is_cache_valid(self, cache_entry: Dict) -> bool:
-        """Verifica se o cache ainda é válido."""
+        """
+        Verifica se a entrada do cache ainda pode ser usada.
+        A versão do arquivo é conferida pelo hash do modifiedTime em _get_cached;
+        aqui só descarta entradas sem uso há mais de CACHE_MAX_AGE.
+        """
         if not cache_entry:
             return False
         
@@ -92,110 +291,342 @@ class GDriveWarehouse:
         if not timestamp:
             return False
         
-        return datetime.now() - timestamp < self.cache_ttl
+        return datetime.now() - timestamp < CACHE_MAX_AGE
     
     def _get_file_hash(self, file_id: str) -> str:
-        """Gera hash do arquivo baseado no ID e modified time."""
+        """
+        Gera hash do arquivo baseado no ID e modified time.
+        Usa o modifiedTime já obtido na indexação; só consulta a API
+        se o arquivo não estiver no índice.
+        """
         try:
-            file_meta = self.drive_service.files().get(
-                fileId=file_id, fields='id,modifiedTime'
-            ).execute()
-            hash_string = f"{file_id}_{file_meta.get('modifiedTime', '')}"
+            self._build_file_index()
+            try:
+                modified_time = self._modified_times[file_id]
+            except KeyError:
+                file_meta = self.drive_service.files().get(
+                    fileId=file_id, fields='id,modifiedTime'
+                ).execute(http=self._thread_http())
+                modified_time = file_meta.get('modifiedTime', '')
+                self._modified_times[file_id] = modified_time
+            hash_string = f"{file_id}_{modified_time}"
             return hashlib.md5(hash_string.encode()).hexdigest()
         except Exception as e:
             print(f"  Aviso: Erro ao obter hash: {e}")
             return hashlib.md5(file_id.encode()).hexdigest()
     
+    def _refresh_modified_times(self, file_ids: List[str]):
+        """
+        Atualiza o modifiedTime de vários arquivos via requisições em lote
+        (até 100 sub-requisições por chamada HTTP).
+        """
+        def callback(request_id, response, exception):
+            if exception is not None:
+                print(f"  Aviso: Erro ao obter modifiedTime de {request_id}: {exception}")
+                return
+            self._modified_times[request_id] = response.get('modifiedTime', '')
+        
+        # O lote não aceita request_id repetido
+        file_ids = list(dict.fromkeys(file_ids))
+        
+        for start in range(0, len(file_ids), 100):
+            try:
+                batch = self.drive_service.new_batch_http_request(callback=callback)
+                for file_id in file_ids[start:start + 100]:
+                    batch.add(
+                        self.drive_service.files().get(
+                            fileId=file_id, fields='id,modifiedTime', supportsAllDrives=True
+                        ),
+                        request_id=file_id
+                    )
+                batch.execute(http=self._thread_http())
+            except Exception as e:
+                print(f"  Aviso: Erro na requisição em lote: {e}")
+    
     def _build_file_index(self, force_refresh: bool = False) -> Dict[str, Dict]:
         """
         Constrói índice de arquivos disponíveis (sem baixar).
         Retorna: {nome_tabela: file_info}
         """
-        # Verifica cache do índice
-        if not force_refresh and self._file_index is not None:
-            if self._file_index_timestamp and \
-               datetime.now() - self._file_index_timestamp < self.cache_ttl:
-                return self._file_index
-        
-        print("📋 Indexando arquivos no Google Drive...")
-        
-        all_files = self._list_files_recursive(self.folder_id)
-        
-        # Filtra apenas arquivos suportados
-        file_index = {}
-        for file in all_files:
-            mime_type = file['mimeType']
-            file_name = file['name']
+        with self._index_lock:
+            # Verifica (de novo, já com o lock) o cache do índice
+            if not force_refresh and self._file_index is not None:
+                if self._file_index_timestamp and \
+                   datetime.now() - self._file_index_timestamp < self.cache_ttl:
+                    return self._file_index
             
-            # Google Sheets
-            if mime_type == 'application/vnd.google-apps.spreadsheet':
-                key = file_name
-                file_index[key] = file
+            print("📋 Indexando arquivos no Google Drive...")
             
-            # Arquivos regulares
-            else:
-                ext = file_name.lower().split('.')[-1]
-                if ext in ['csv', 'xlsx', 'xls', 'json','geojson']:
+            all_files = self._list_shared_drive(self.folder_id)
+            if all_files is None:
+                all_files = self._list_files_recursive(self.folder_id)
+            
+            # Filtra apenas arquivos suportados (pela extensão: o Drive grava .csv/.geojson
+            # com MIME types variados, como text/plain e application/octet-stream)
+            file_index = {}
+            for file in all_files:
+                file_name = file['name']
+                
+                # Google Sheets
+                if file['mimeType'] == SHEET_MIME:
+                    file_index[file_name] = file
+                
+                # Arquivos regulares
+                elif file_name.lower().split('.')[-1] in SUPPORTED_EXTENSIONS:
                     key = file_name.rsplit('.', 1)[0]  # Remove extensão
                     file_index[key] = file
-        
-        self._file_index = file_index
-        self._file_index_timestamp = datetime.now()
-        
-        print(f"✓ {len(file_index)} arquivos indexados\n")
-        
-        return file_index
+            
+            self._file_index = file_index
+            self._file_index_timestamp = datetime.now()
+            self._modified_times = {
+                file['id']: file.get('modifiedTime', '') for file in file_index.values()
+            }
+            
+            print(f"✓ {len(file_index)} arquivos indexados\n")
+            
+            return file_index
     
-    def _list_files_recursive(self, folder_id: str) -> List[Dict]:
-        """Lista todos os arquivos da pasta recursivamente."""
-        all_files = []
+    def _new_http(self) -> AuthorizedHttp:
+        """Cria um cliente HTTP autenticado que aceita respostas gzip."""
+        # build_http() é o transporte que o build(credentials=...) usaria (timeout de 60s)
+        http = AuthorizedHttp(self._creds, http=build_http())
+        # httplib2 já envia Accept-Encoding: gzip e descomprime a resposta
+        set_user_agent(http, USER_AGENT)
+        return http
+    
+    def _thread_http(self) -> AuthorizedHttp:
+        """Retorna um cliente HTTP autenticado exclusivo da thread atual."""
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = self._new_http()
+            self._local.http = http
+        return http
+    
+    def _list_folder(self, folder_id: str) -> List[Dict]:
+        """Lista os filhos diretos de uma pasta (todas as páginas)."""
+        children = []
         query = f"'{folder_id}' in parents and trashed=false"
         page_token = None
         
         while True:
+            # num_retries aplica backoff exponencial em 429/5xx
             results = self.drive_service.files().list(
                 q=query,
                 supportsAllDrives=True,
                 includeItemsFromAllDrives=True,
-                pageSize=100,
-                fields="nextPageToken, files(id, name, mimeType, modifiedTime, parents)",
+                pageSize=1000,
+                fields="nextPageToken, files(id, name, mimeType, modifiedTime)",
                 pageToken=page_token
-            ).execute()
+            ).execute(http=self._thread_http(), num_retries=5)
             
-            files = results.get('files', [])
+            children.extend(results.get('files', []))
             
-            for file in files:
-                mime_type = file['mimeType']
-                
-                # Se for pasta, busca recursivamente
-                if mime_type == 'application/vnd.google-apps.folder':
-                    subfolder_files = self._list_files_recursive(file['id'])
-                    all_files.extend(subfolder_files)
-                else:
-                    all_files.append(file)
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+        
+        return children
+    
+    def _list_shared_drive(self, drive_id: str) -> Optional[List[Dict]]:
+        """
+        Se a raiz for um Drive compartilhado, lista todo o conteúdo com uma única
+        consulta paginada e monta a árvore em memória.
+        Retorna None se a raiz for uma pasta comum.
+        """
+        if self._is_shared_drive is None:
+            try:
+                self.drive_service.drives().get(driveId=drive_id, fields='id').execute(
+                    http=self._thread_http()
+                )
+                self._is_shared_drive = True
+            except HttpError:
+                self._is_shared_drive = False
+        
+        if not self._is_shared_drive:
+            return None
+        
+        items = []
+        page_token = None
+        while True:
+            results = self.drive_service.files().list(
+                q="trashed=false",
+                corpora='drive',
+                driveId=drive_id,
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True,
+                pageSize=1000,
+                fields="nextPageToken, files(id, name, mimeType, modifiedTime, parents)",
+                pageToken=page_token
+            ).execute(http=self._thread_http(), num_retries=5)
+            
+            items.extend(results.get('files', []))
             
             page_token = results.get('nextPageToken')
             if not page_token:
                 break
         
+        # Mapa pai -> filhos
+        children = {}
+        for item in items:
+            for parent in item.pop('parents', []):
+                children.setdefault(parent, []).append(item)
+        
+        # Percorre a árvore a partir da raiz
+        all_files = []
+        stack = [drive_id]
+        while stack:
+            for item in children.get(stack.pop(), []):
+                if item['mimeType'] == FOLDER_MIME:
+                    stack.append(item['id'])
+                else:
+                    all_files.append(item)
+        
         return all_files
     
+    def _list_files_recursive(self, folder_id: str) -> List[Dict]:
+        """
+        Lista todos os arquivos da pasta recursivamente.
+        Percorre as subpastas em largura, consultando até max_workers pastas em paralelo.
+        Cada pasta gera uma única consulta; subpastas e arquivos são separados aqui.
+        """
+        all_files = []
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {executor.submit(self._list_folder, folder_id)}
+            
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    for file in future.result():
+                        # Se for pasta, enfileira a listagem
+                        if file['mimeType'] == FOLDER_MIME:
+                            pending.add(executor.submit(self._list_folder, file['id']))
+                        else:
+                            all_files.append(file)
+        
+        return all_files
+    
+    def _thread_session(self) -> Optional['AuthorizedSession']:
+        """Retorna uma sessão HTTP (requests) autenticada exclusiva da thread atual."""
+        if AuthorizedSession is None:
+            return None
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = AuthorizedSession(self._creds)
+            self._local.session = session
+        return session
+    
     def _download_file(self, file_id: str) -> io.BytesIO:
-        """Baixa arquivo do Drive direto na memória."""
+        """
+        Baixa arquivo do Drive direto na memória (seguro para uso em threads).
+        Faz um único GET em streaming, com resposta gzip quando o servidor suporta.
+        """
+        session = self._thread_session()
+        if session is None:
+            return self._download_file_media(file_id)
+        
+        buffer = io.BytesIO()
+        with session.get(
+            DOWNLOAD_URL.format(file_id=file_id),
+            stream=True,
+            headers={'Accept-Encoding': 'gzip', 'User-Agent': USER_AGENT},
+            timeout=DOWNLOAD_TIMEOUT
+        ) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True  # descomprime o gzip durante a cópia
+            shutil.copyfileobj(response.raw, buffer, length=1 << 20)
+        
+        buffer.seek(0)
+        return buffer
+    
+    def _download_file_media(self, file_id: str) -> io.BytesIO:
+        """Baixa arquivo via protocolo de download do googleapiclient (em partes)."""
         request = self.drive_service.files().get_media(fileId=file_id)
+        request.http = self._thread_http()
         buffer = io.BytesIO()
-        downloader = MediaIoBaseDownload(buffer, request)
+        downloader = MediaIoBaseDownload(buffer, request, chunksize=DOWNLOAD_CHUNK_SIZE)
         
         done = False
         while not done:
-            status, done = downloader.next_chunk()
-            if status:
-                print(f"  Download: {int(status.progress() * 100)}%", end='\r')
+            _, done = downloader.next_chunk()
         
-        print()  # Nova linha após o download
         buffer.seek(0)
         return buffer
     
+    def _get_sheet_titles(self, file_id: str) -> List[str]:
+        """Retorna os títulos das abas de um Google Sheet (em cache até mudar o modifiedTime)."""
+        modified_time = self._modified_times.get(file_id)
+        cached = self._sheet_meta_cache.get(file_id)
+        if cached and modified_time is not None and cached['modified_time'] == modified_time:
+            return cached['titles']
+        
+        spreadsheet = self.sheets_service.spreadsheets().get(
+            spreadsheetId=file_id,
+            fields='sheets.properties.title'
+        ).execute(http=self._thread_http())
+        
+        titles = [s['properties']['title'] for s in spreadsheet.get('sheets', [])]
+        self._sheet_meta_cache[file_id] = {'modified_time': modified_time, 'titles': titles}
+        return titles
+    
+    def _resolve_sheet_title(self, titles: List[str], target_sheet: Union[str, int], file_name: str) -> Optional[str]:
+        """Determina o título da aba a partir do nome ou índice."""
+        if not titles:
+            print(f"  ⚠️  Nenhuma aba encontrada em: {file_name}")
+            return None
+        
+        if isinstance(target_sheet, int):
+            if target_sheet >= len(titles):
+                print(f"  ⚠️  Índice {target_sheet} inválido. Total de abas: {len(titles)}")
+                return None
+            return titles[target_sheet]
+        
+        if target_sheet not in titles:
+            print(f"  ⚠️  Aba '{target_sheet}' não encontrada. Disponíveis: {titles}")
+            return None
+        return target_sheet
+    
+    def _strip_columns(self, df: pd.DataFrame):
+        """Remove espaços nas bordas dos nomes de colunas (in-place)."""
+        if pc is not None and df.columns.inferred_type == 'string':
+            # Kernel UTF-8 vetorizado do Arrow, sem loop Python por coluna
+            trimmed = pc.utf8_trim_whitespace(pa.array(df.columns, type=pa.string()))
+            df.columns = pd.Index(trimmed.to_pylist())
+        else:
+            df.columns = df.columns.str.strip()
+    
+    def _values_to_df(self, values: List[List], sheet_title: str) -> Optional[pd.DataFrame]:
+        """Converte os valores de uma aba (1ª linha = cabeçalho) em DataFrame."""
+        if not values:
+            print(f"  ⚠️  Aba vazia: {sheet_title}")
+            return None
+        
+        # Linhas mais largas que o cabeçalho: dá nomes às colunas extras (como o pandas)
+        header = list(values[0])
+        n_cols = max(len(row) for row in values)
+        if n_cols > len(header):
+            print(f"  ⚠️  {n_cols - len(header)} coluna(s) sem cabeçalho na aba {sheet_title}")
+            header += [f"Unnamed: {i}" for i in range(len(header), n_cols)]
+        
+        if pa is not None:
+            # Monta colunas Arrow diretamente (sem DataFrame de objetos célula a célula);
+            # a API omite células vazias no fim da linha, então completa com None
+            rows = [row[:n_cols] + [None] * (n_cols - len(row)) for row in values[1:]]
+            columns = list(zip(*rows)) if rows else [()] * n_cols
+            tbl = pa.Table.from_arrays(
+                [pa.array(col, type=pa.string()) for col in columns],
+                names=[str(name) for name in header]
+            )
+            df = tbl.to_pandas(types_mapper=pd.ArrowDtype)
+        else:
+            df = pd.DataFrame(values[1:], columns=header)
+        self._strip_columns(df)
+        
+        print(f"  📊 Google Sheet (aba: {sheet_title})")
+        
+        return df
+    
     def _read_google_sheet(self, file_id: str, file_name: str, sheet_name: Union[str, int, None] = None) -> Optional[pd.DataFrame]:
         """
         Lê um Google Spreadsheet e retorna DataFrame.
@@ -203,177 +634,544 @@ class GDriveWarehouse:
         try:
             target_sheet = sheet_name if sheet_name is not None else self.sheet_name
             
-            spreadsheet = self.sheets_service.spreadsheets().get(
-                spreadsheetId=file_id
-            ).execute()
-            
-            sheets = spreadsheet.get('sheets', [])
-            
-            if not sheets:
-                print(f"  ⚠️  Nenhuma aba encontrada em: {file_name}")
+            sheet_title = self._resolve_sheet_title(
+                self._get_sheet_titles(file_id), target_sheet, file_name
+            )
+            if sheet_title is None:
                 return None
             
-            # Determina qual aba ler
-            if isinstance(target_sheet, int):
-                if target_sheet >= len(sheets):
-                    print(f"  ⚠️  Índice {target_sheet} inválido. Total de abas: {len(sheets)}")
-                    return None
-                sheet_title = sheets[target_sheet]['properties']['title']
-            else:
-                sheet_title = target_sheet
-                sheet_names = [s['properties']['title'] for s in sheets]
-                if sheet_title not in sheet_names:
-                    print(f"  ⚠️  Aba '{sheet_title}' não encontrada. Disponíveis: {sheet_names}")
-                    return None
-            
             # Lê os dados da aba
             range_name = f"'{sheet_title}'!A1:ZZ"
             result = self.sheets_service.spreadsheets().values().get(
                 spreadsheetId=file_id,
-                range=range_name
-            ).execute()
+                range=range_name,
+                fields='values'
+            ).execute(http=self._thread_http())
             
-            values = result.get('values', [])
+            return self._values_to_df(result.get('values', []), sheet_title)
             
-            if not values:
-                print(f"  ⚠️  Aba vazia: {sheet_title}")
-                return None
+        except Exception as e:
+            print(f"  ✗ ERRO ao ler Google Sheet {file_name}: {str(e)}")
+            return None
+    
+    def _prefetch_google_sheets(self, file_info: Dict, sheet_names: List[Union[str, int]]):
+        """
+        Lê várias abas de um Google Sheet em uma única chamada (values.batchGet)
+        e as coloca no cache; abas já em cache são ignoradas.
+        """
+        file_id = file_info['id']
+        file_name = file_info['name']
+        
+        try:
+            file_hash = self._get_file_hash(file_id)
+            titles = self._get_sheet_titles(file_id)
             
-            df = pd.DataFrame(values[1:], columns=values[0])
-            df.columns = df.columns.str.strip()
+            pending = {}  # {aba pedida: título}
+            for sheet in sheet_names:
+                if self._valid_cache_entry(self._cache_key(file_id, sheet), file_id) is not None:
+                    continue
+                sheet_title = self._resolve_sheet_title(titles, sheet, file_name)
+                if sheet_title is not None:
+                    pending[sheet] = sheet_title
             
-            print(f"  📊 Google Sheet (aba: {sheet_title})")
+            if not pending:
+                return
             
-            return df
+            result = self.sheets_service.spreadsheets().values().batchGet(
+                spreadsheetId=file_id,
+                ranges=[f"'{title}'!A1:ZZ" for title in pending.values()],
+                fields='valueRanges(values)'
+            ).execute(http=self._thread_http())
+            
+            for (sheet, sheet_title), value_range in zip(pending.items(), result.get('valueRanges', [])):
+                df = self._values_to_df(value_range.get('values', []), sheet_title)
+                if df is not None:
+                    cache_key = self._cache_key(file_id, sheet)
+                    # Mesmo lock do _read_file: não sobrescreve uma leitura em andamento
+                    with self._file_lock(cache_key):
+                        if self._valid_cache_entry(cache_key, file_id) is not None:
+                            continue
+                        cached = self._to_cache(self._shrink(df))
+                        self._store_cache(cache_key, file_hash, file_name, cached)
+                        self._write_disk_cache(cache_key, file_id, file_hash, cached)
             
         except Exception as e:
             print(f"  ✗ ERRO ao ler Google Sheet {file_name}: {str(e)}")
+    
+    def _sniff_csv(self, buffer: io.BytesIO) -> tuple:
+        """
+        Detecta encoding e separador numa amostra do início do arquivo.
+        Retorna: (encoding, separador). Levanta csv.Error se não identificar o separador.
+        """
+        sample = buffer.getvalue()[:CSV_SAMPLE_SIZE]
+        
+        try:
+            # Decodificador incremental: tolera caractere cortado no fim da amostra
+            codecs.getincrementaldecoder('utf-8')().decode(sample)
+            enc = 'utf-8'
+        except UnicodeDecodeError:
+            enc = 'latin-1'
+            # O charset_normalizer só decide entre os encodings esperados (ex.: cp1252)
+            if charset_normalizer is not None:
+                best = charset_normalizer.from_bytes(sample).best()
+                allowed = {codecs.lookup(e).name for e in CSV_DETECTED_ENCODINGS}
+                if best is not None and codecs.lookup(best.encoding).name in allowed:
+                    enc = best.encoding
+        
+        # Descarta a última linha (possivelmente incompleta) antes de farejar
+        text = sample.decode(enc, errors='ignore')
+        if len(sample) == CSV_SAMPLE_SIZE and '\n' in text:
+            text = text.rsplit('\n', 1)[0]
+        
+        dialect = csv.Sniffer().sniff(text, delimiters=''.join(CSV_SEPARATORS))
+        return enc, dialect.delimiter
+    
+    @staticmethod
+    def _csv_column_names(names: List[str]) -> List[str]:
+        """Nomeia as colunas como o pd.read_csv: vazias viram 'Unnamed: N' e repetidas 'a.1', 'a.2'..."""
+        header = [name or f"Unnamed: {i}" for i, name in enumerate(names)]
+        taken = set(header)
+        counts = {}
+        result = []
+        for name in header:
+            base = name
+            count = counts.get(base, 0)
+            while count > 0:
+                counts[base] = count + 1
+                name = f"{base}.{count}"
+                # Pula sufixos que já existem no cabeçalho original
+                count = count + 1 if name in taken else counts.get(name, 0)
+            counts[name] = count + 1
+            result.append(name)
+        return result
+    
+    def _read_csv(self, buffer: io.BytesIO) -> Optional[pd.DataFrame]:
+        """
+        Lê CSV numa única passada, com encoding e separador detectados na amostra.
+        Usa o leitor multithread do PyArrow quando disponível; se a detecção
+        ou a leitura falhar, testa as combinações com o leitor do pandas.
+        """
+        try:
+            enc, sep = self._sniff_csv(buffer)
+        except csv.Error:
+            return self._read_csv_pandas(buffer)
+        
+        try:
+            buffer.seek(0)
+            if pacsv is not None:
+                tbl = pacsv.read_csv(
+                    buffer,
+                    read_options=pacsv.ReadOptions(block_size=16 << 20, encoding=enc),
+                    parse_options=pacsv.ParseOptions(delimiter=sep),
+                    # Células vazias e 'NA' em colunas de texto viram nulos, como no pandas
+                    convert_options=pacsv.ConvertOptions(strings_can_be_null=True)
+                )
+                names = self._csv_column_names(tbl.column_names)
+                if names != tbl.column_names:
+                    tbl = tbl.rename_columns(names)
+                df = tbl.to_pandas(types_mapper=pd.ArrowDtype, self_destruct=True)
+            else:
+                df = pd.read_csv(buffer, encoding=enc, sep=sep, **DTYPE_BACKEND)
+        except Exception:
+            return self._read_csv_pandas(buffer)
+        
+        # valida: se veio mais de 1 coluna, o sep está correto
+        if df.shape[1] <= 1:
+            return self._read_csv_pandas(buffer)
+        
+        print(f"  📄 Encoding: {enc} | sep: '{sep}'")
+        return df
+    
+    def _read_csv_pandas(self, buffer: io.BytesIO) -> Optional[pd.DataFrame]:
+        """Lê CSV testando combinações de encoding e separador com o pandas."""
+        for enc in CSV_ENCODINGS:
+            for sep in CSV_SEPARATORS:
+                try:
+                    buffer.seek(0)
+                    df = pd.read_csv(buffer, encoding=enc, sep=sep, **DTYPE_BACKEND)
+                    # valida: se veio mais de 1 coluna, o sep está correto
+                    if df.shape[1] > 1:
+                        print(f"  📄 Encoding: {enc} | sep: '{sep}'")
+                        return df
+                except Exception:
+                    pass
+        
+        return None
+    
+    @contextmanager
+    def _file_lock(self, cache_key: str):
+        """
+        Segura o lock de leitura de um arquivo/aba (criado sob demanda).
+        O lock sai do dicionário quando a última thread que o usa termina.
+        """
+        with self._file_locks_guard:
+            entry = self._file_locks.setdefault(cache_key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._file_locks_guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._file_locks[cache_key]
+    
+    def _cache_key(self, file_id: str, sheet_name: Union[str, int, None] = None) -> str:
+        """Chave do cache para um arquivo/aba."""
+        return f"{file_id}_{sheet_name if sheet_name else self.sheet_name}"
+    
+    def _to_cache(self, df: Union[pd.DataFrame, gpd.GeoDataFrame, 'pa.Table']) -> Union[pd.DataFrame, 'pa.Table']:
+        """
+        Converte o DataFrame para o formato guardado no cache.
+        DataFrames comuns viram pa.Table (imutável, sem cópia na leitura);
+        GeoDataFrames, ou se o Arrow não suportar as colunas, ficam como estão.
+        """
+        if pa is None or isinstance(df, (pa.Table, gpd.GeoDataFrame)):
+            return df
+        try:
+            return pa.Table.from_pandas(df)
+        except (pa.ArrowException, TypeError, ValueError):
+            return df
+    
+    def _from_cache(self, cached: Union[pd.DataFrame, 'pa.Table']) -> Union[pd.DataFrame, gpd.GeoDataFrame]:
+        """
+        Converte o conteúdo do cache de volta para DataFrame (compartilhando memória).
+        É a única conversão Arrow -> pandas dos caches, para que a tabela tenha os
+        mesmos dtypes na primeira leitura, no cache em memória e no cache em disco.
+        """
+        if pa is not None and isinstance(cached, pa.Table):
+            try:
+                # Colunas dictionary (category) voltam como category, o resto como ArrowDtype
+                return cached.to_pandas(
+                    types_mapper=lambda t: None if pa.types.is_dictionary(t) else pd.ArrowDtype(t)
+                )
+            except (pa.ArrowException, TypeError, ValueError, NotImplementedError):
+                return cached.to_pandas()
+        return cached
+    
+    def _shrink(self, df: Union[pd.DataFrame, gpd.GeoDataFrame]) -> Union[pd.DataFrame, gpd.GeoDataFrame]:
+        """
+        Reduz a memória do DataFrame: inteiros de 64 bits para int32 quando os valores cabem
+        (sem tipos menores nem unsigned, que estouram/dão wraparound em contas posteriores)
+        e colunas de texto com poucos valores distintos para category.
+        Floats não são reduzidos (float32 perderia precisão em valores monetários).
+        """
+        geometry = df.geometry.name if isinstance(df, gpd.GeoDataFrame) else None
+        n_rows = len(df)
+        
+        for col in df.columns:
+            if col == geometry:
+                continue
+            series = df[col]
+            try:
+                if pd.api.types.is_bool_dtype(series):
+                    continue
+                elif pd.api.types.is_integer_dtype(series):
+                    if series.dtype.itemsize > 4 and -2**31 <= series.min() and series.max() < 2**31:
+                        df[col] = series.astype(self._int32_dtype(series.dtype))
+                elif n_rows and (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+                    if series.nunique() / n_rows < CATEGORY_MAX_RATIO:
+                        df[col] = series.astype('category')
+            except (TypeError, ValueError):
+                # Ex.: coluna object com valores não hasheáveis (listas do JSON)
+                pass
+        
+        return df
+    
+    @staticmethod
+    def _int32_dtype(dtype):
+        """int32 no mesmo backend do dtype original (numpy, nullable ou Arrow)."""
+        if isinstance(dtype, pd.ArrowDtype):
+            return pd.ArrowDtype(pa.int32())
+        if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+            return 'Int32'
+        return 'int32'
+    
+    def _store_cache(
+        self,
+        cache_key: str,
+        file_hash: str,
+        file_name: str,
+        df: Union[pd.DataFrame, gpd.GeoDataFrame, 'pa.Table']
+    ) -> Union[pd.DataFrame, gpd.GeoDataFrame]:
+        """
+        Armazena o DataFrame (ou pa.Table) no cache em memória.
+        Retorna o DataFrame como será lido do cache (mesmos dtypes de um acerto).
+        """
+        self._purge_expired_cache()
+        cached = self._to_cache(df)
+        self._cache[cache_key] = {
+            'df': cached,
+            'timestamp': datetime.now(),
+            'hash': file_hash,
+            'file_name': file_name
+        }
+        return self._from_cache(cached)
+    
+    def _valid_cache_entry(self, cache_key: str, file_id: str) -> Optional[Dict]:
+        """Retorna a entrada do cache se ainda for válida para a versão atual do arquivo, senão None."""
+        cache_entry = self._cache.get(cache_key)
+        
+        if not self._is_cache_valid(cache_entry):
+            self._cache.pop(cache_key, None)
+            return None
+        
+        if self._get_file_hash(file_id) == cache_entry.get('hash'):
+            # Acerto validado pelo hash: renova o prazo de CACHE_MAX_AGE
+            cache_entry['timestamp'] = datetime.now()
+            return cache_entry
+        
+        return None
+    
+    def _purge_expired_cache(self):
+        """Remove do cache em memória as entradas expiradas (que nunca mais seriam lidas)."""
+        for cache_key, cache_entry in list(self._cache.items()):
+            if not self._is_cache_valid(cache_entry):
+                self._cache.pop(cache_key, None)
+    
+    def _get_cached(self, cache_key: str, file_id: str) -> Optional[Union[pd.DataFrame, gpd.GeoDataFrame]]:
+        """
+        Retorna o DataFrame em cache se ainda for válido, senão None.
+        O DataFrame retornado compartilha memória com o cache (sem cópia):
+        colunas Arrow são imutáveis, mas GeoDataFrames são a mesma instância.
+        """
+        cache_entry = self._valid_cache_entry(cache_key, file_id)
+        if cache_entry is None:
+            return None
+        return self._from_cache(cache_entry['df'])
+    
+    def _disk_cache_prefix(self, cache_key: str, file_id: str) -> str:
+        """Prefixo dos arquivos do cache em disco de um arquivo/aba."""
+        return f"{file_id}_{hashlib.md5(cache_key.encode()).hexdigest()[:8]}"
+    
+    def _find_disk_cache(self, cache_key: str, file_id: str, file_hash: str) -> Optional[Path]:
+        """Retorna o Parquet em disco da versão atual do arquivo, se existir."""
+        if self.disk_cache_dir is None:
+            return None
+        
+        prefix = self._disk_cache_prefix(cache_key, file_id)
+        for suffix in ['.parquet', '.geo.parquet']:
+            path = self.disk_cache_dir / f"{prefix}_{file_hash}{suffix}"
+            if path.exists():
+                return path
+        return None
+    
+    def _read_disk_cache(self, path: Path) -> Optional[Union[gpd.GeoDataFrame, 'pa.Table']]:
+        """
+        Lê o cache em disco: GeoDataFrame, ou pa.Table para os demais
+        (o schema Arrow salvo no Parquet preserva os tipos do cache em memória).
+        """
+        try:
+            if path.name.endswith('.geo.parquet'):
+                return gpd.read_parquet(path)
+            return pq.read_table(path)
+        except Exception as e:
+            print(f"  Aviso: Erro ao ler cache em disco: {e}")
             return None
     
-    def _read_file(self, file_info: Dict, sheet_name: Union[str, int, None] = None) -> Optional[Union[pd.DataFrame, gpd.GeoDataFrame]]:
+    def _write_disk_cache(self, cache_key: str, file_id: str, file_hash: str, df: Union[pd.DataFrame, 'pa.Table']):
+        """Grava o DataFrame (ou pa.Table) no cache em disco e remove versões antigas do mesmo arquivo/aba."""
+        if self.disk_cache_dir is None:
+            return
+        
+        prefix = self._disk_cache_prefix(cache_key, file_id)
+        is_geo = isinstance(df, gpd.GeoDataFrame)
+        path = self.disk_cache_dir / f"{prefix}_{file_hash}{'.geo' if is_geo else ''}.parquet"
+        
+        try:
+            # Remove versões antigas (hash md5 tem 32 caracteres)
+            for stale in self.disk_cache_dir.glob(f"{prefix}_{'?' * 32}*.parquet"):
+                if stale != path:
+                    stale.unlink(missing_ok=True)
+            
+            if isinstance(df, pa.Table):
+                pq.write_table(df, path, compression='zstd')
+            else:
+                df.to_parquet(path, compression='zstd')
+        except Exception as e:
+            # Ex.: colunas object com tipos mistos que o Arrow não serializa
+            print(f"  Aviso: Erro ao gravar cache em disco: {e}")
+            path.unlink(missing_ok=True)
+    
+    def _delete_disk_cache(self, cache_key: str, file_id: str):
+        """Remove todas as versões do arquivo/aba do cache em disco."""
+        if self.disk_cache_dir is None:
+            return
+        
+        prefix = self._disk_cache_prefix(cache_key, file_id)
+        try:
+            for path in self.disk_cache_dir.glob(f"{prefix}_{'?' * 32}*.parquet"):
+                path.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"  Aviso: Erro ao remover cache em disco: {e}")
+    
+    def _needs_download(self, file_info: Dict, sheet_name: Union[str, int, None] = None) -> bool:
+        """Indica se o arquivo precisa ser baixado (fora dos caches e não é Google Sheet)."""
+        if file_info['mimeType'] == SHEET_MIME:
+            return False
+        
+        file_id = file_info['id']
+        cache_key = self._cache_key(file_id, sheet_name)
+        if self._valid_cache_entry(cache_key, file_id) is not None:
+            return False
+        
+        return self._find_disk_cache(cache_key, file_id, self._get_file_hash(file_id)) is None
+    
+    def _read_geojson(self, buffer: io.BytesIO) -> gpd.GeoDataFrame:
+        """Lê GeoJSON com pyogrio (leitura vetorizada do GDAL); usa Fiona se não estiver instalado."""
+        try:
+            return gpd.read_file(buffer, engine='pyogrio')
+        except ImportError:
+            buffer.seek(0)
+            return gpd.read_file(buffer, engine='fiona')
+    
+    def _records_to_df(self, records: List) -> pd.DataFrame:
+        """
+        Converte uma lista de registros JSON em DataFrame.
+        Listas grandes são convertidas em colunas Arrow (structs aninhados viram
+        colunas 'pai.filho', como no json_normalize) sem passar pelo pandas linha a linha.
+        """
+        if pa is not None and len(records) > JSON_ARROW_MIN_RECORDS:
+            try:
+                tbl = pa.Table.from_struct_array(pa.array(records))
+                while any(pa.types.is_struct(field.type) for field in tbl.schema):
+                    tbl = tbl.flatten()
+                return tbl.to_pandas(types_mapper=pd.ArrowDtype)
+            except (pa.ArrowException, TypeError):
+                # Ex.: tipos mistos na mesma chave ou registros que não são objetos
+                pass
+        
+        return pd.json_normalize(records)
+    
+    def _read_file(
+        self,
+        file_info: Dict,
+        sheet_name: Union[str, int, None] = None,
+        buffer: Optional[io.BytesIO] = None
+    ) -> Optional[Union[pd.DataFrame, gpd.GeoDataFrame]]:
         """
         Lê um arquivo e retorna DataFrame ou GeoDataFrame.
         Verifica cache antes de baixar.
+        Se buffer for informado (já baixado), não baixa de novo.
         """
         file_name = file_info['name']
         file_id = file_info['id']
         mime_type = file_info['mimeType']
         
         # Identifica o tipo
-        is_google_sheet = mime_type == 'application/vnd.google-apps.spreadsheet'
+        is_google_sheet = mime_type == SHEET_MIME
         
         if is_google_sheet:
             file_type = 'google_sheet'
         else:
             ext = file_name.lower().split('.')[-1]
-            if ext not in ['csv', 'xlsx', 'xls', 'json', 'geojson']:
+            if ext not in SUPPORTED_EXTENSIONS:
                 return None
             file_type = ext
         
         # Verifica cache
-        cache_key = f"{file_id}_{sheet_name if sheet_name else self.sheet_name}"
+        cache_key = self._cache_key(file_id, sheet_name)
         
-        if cache_key in self._cache:
-            cache_entry = self._cache[cache_key]
-            
-            if self._is_cache_valid(cache_entry):
-                current_hash = self._get_file_hash(file_id)
-                if current_hash == cache_entry.get('hash'):
+        # Outras threads pedindo o mesmo arquivo esperam e reaproveitam o cache
+        with self._file_lock(cache_key):
+            try:
+                cached_df = self._get_cached(cache_key, file_id)
+                if cached_df is not None:
                     print(f"📦 Cache: {file_name}")
-                    return cache_entry['df'].copy()
-        
-        # Download e leitura
-        print(f"↓ Carregando: {file_name}")
-        
-        try:
-            if is_google_sheet:
-                df = self._read_google_sheet(file_id, file_name, sheet_name)
-            else:
-                buffer = self._download_file(file_id)
+                    return cached_df
                 
-                excel_sheet = sheet_name if sheet_name is not None else self.sheet_name
+                # Verifica cache em disco
+                file_hash = self._get_file_hash(file_id)
+                disk_path = self._find_disk_cache(cache_key, file_id, file_hash)
+                if disk_path is not None:
+                    cached = self._read_disk_cache(disk_path)
+                    if cached is not None:
+                        print(f"💾 Cache em disco: {file_name}")
+                        return self._store_cache(cache_key, file_hash, file_name, cached)
                 
-                if file_type == 'csv':
-                    # Tenta UTF-8 primeiro, depois Latin-1
-                    seps = [";", ",", "|"]
-                    encodings = ["utf-8", "latin-1"]
-                    df = None
-                    for enc in encodings:
-                        for sep in seps:
-                            try:
-                                buffer.seek(0)
-                                df_test = pd.read_csv(buffer, encoding=enc, sep=sep)
-                                # valida: se veio mais de 1 coluna, o sep está correto
-                                if df_test.shape[1] > 1:
-                                    df = df_test
-                                    print(f"  📄 Encoding: {enc} | sep: '{sep}'")
-                                    break
-                            except Exception:
-                                pass
-                        if df is not None:
-                            break
-
-                elif file_type in ['xlsx', 'xls']:
-                    df = pd.read_excel(buffer, sheet_name=excel_sheet)
+                # Download e leitura
+                print(f"↓ Carregando: {file_name}")
+                
+                if is_google_sheet:
+                    df = self._read_google_sheet(file_id, file_name, sheet_name)
+                else:
+                    if buffer is None:
+                        buffer = self._download_file(file_id)
                     
-                elif file_type == 'json':
-                    buffer.seek(0)
-                    data = json.load(buffer)
+                    excel_sheet = sheet_name if sheet_name is not None else self.sheet_name
                     
-                    # Verifica se é um GeoJSON disfarçado
-                    if isinstance(data, dict) and data.get('type') == 'FeatureCollection':
-                        # É um GeoJSON, usa geopandas
-                        buffer.seek(0)
-                        df = gpd.read_file(buffer)
-                        print(f"  🗺️  GeoJSON detectado ({df.crs})")
-                    else:
-                        # JSON normal
-                        if isinstance(data, list):
-                            df = pd.json_normalize(data)
-                        elif isinstance(data, dict):
-                            # Se for dict com lista de registros
-                            if any(isinstance(v, list) for v in data.values()):
-                                # Tenta encontrar a lista principal
-                                for key, value in data.items():
-                                    if isinstance(value, list) and len(value) > 0:
-                                        df = pd.json_normalize(value)
-                                        print(f"  📄 Usando chave: '{key}'")
-                                        break
+                    if file_type == 'csv':
+                        df = self._read_csv(buffer)
+
+                    elif file_type in ['xlsx', 'xls']:
+                        df = pd.read_excel(buffer, sheet_name=excel_sheet, **EXCEL_ENGINE, **DTYPE_BACKEND)
+                        
+                    elif file_type == 'json':
+                        data = None
+                        if orjson is not None:
+                            try:
+                                data = orjson.loads(buffer.getvalue())
+                            except orjson.JSONDecodeError:
+                                # orjson rejeita NaN/Infinity, BOM e UTF-16; o json padrão aceita
+                                pass
+                        if data is None:
+                            buffer.seek(0)
+                            data = json.load(buffer)
+                        
+                        # Verifica se é um GeoJSON disfarçado
+                        if isinstance(data, dict) and data.get('type') == 'FeatureCollection':
+                            # É um GeoJSON, usa geopandas
+                            buffer.seek(0)
+                            df = self._read_geojson(buffer)
+                            print(f"  🗺️  GeoJSON detectado ({df.crs})")
+                        else:
+                            # JSON normal
+                            if isinstance(data, list):
+                                df = self._records_to_df(data)
+                            elif isinstance(data, dict):
+                                # Se for dict com lista de registros
+                                if any(isinstance(v, list) for v in data.values()):
+                                    # Tenta encontrar a lista principal
+                                    for key, value in data.items():
+                                        if isinstance(value, list) and len(value) > 0:
+                                            df = self._records_to_df(value)
+                                            print(f"  📄 Usando chave: '{key}'")
+                                            break
+                                    else:
+                                        df = pd.DataFrame([data])
                                 else:
                                     df = pd.DataFrame([data])
                             else:
                                 df = pd.DataFrame([data])
-                        else:
-                            df = pd.DataFrame([data])
-                        print(f"  📄 JSON carregado")                
-                elif file_type == 'geojson':
-                    buffer.seek(0)
-                    df = gpd.read_file(buffer)
-                    print(f"  🗺️  GeoJSON carregado ({df.crs})")
-            
-            if df is None:
+                            # json_normalize não aceita dtype_backend: converte depois
+                            df = df.convert_dtypes(**DTYPE_BACKEND)
+                            print(f"  📄 JSON carregado")
+                    elif file_type == 'geojson':
+                        buffer.seek(0)
+                        df = self._read_geojson(buffer)
+                        print(f"  🗺️  GeoJSON carregado ({df.crs})")
+                
+                if df is None:
+                    return None
+                
+                # Limpa nomes de colunas (exceto GeoDataFrame que já vem limpo)
+                if isinstance(df, pd.DataFrame) and not isinstance(df, gpd.GeoDataFrame):
+                    self._strip_columns(df)
+                
+                df = self._shrink(df)
+                
+                # Armazena no cache (e devolve com os mesmos dtypes das próximas leituras)
+                cached = self._to_cache(df)
+                df = self._store_cache(cache_key, file_hash, file_name, cached)
+                self._write_disk_cache(cache_key, file_id, file_hash, cached)
+                
+                print(f"✓ {file_name}: {df.shape[0]} linhas × {df.shape[1]} colunas\n")
+                
+                return df
+                
+            except Exception as e:
+                print(f"✗ ERRO ao processar {file_name}: {str(e)}\n")
                 return None
-            
-            # Limpa nomes de colunas (exceto GeoDataFrame que já vem limpo)
-            if isinstance(df, pd.DataFrame) and not isinstance(df, gpd.GeoDataFrame):
-                df.columns = df.columns.str.strip()
-            
-            # Armazena no cache
-            file_hash = self._get_file_hash(file_id)
-            self._cache[cache_key] = {
-                'df': df.copy(),
-                'timestamp': datetime.now(),
-                'hash': file_hash,
-                'file_name': file_name
-            }
-            
-            print(f"✓ {file_name}: {df.shape[0]} linhas × {df.shape[1]} colunas\n")
-            
-            return df
-            
-        except Exception as e:
-            print(f"✗ ERRO ao processar {file_name}: {str(e)}\n")
-            return None
     
     def list_tables(self, force_refresh: bool = False) -> List[str]:
         """
@@ -431,7 +1229,7 @@ class GDriveWarehouse:
             
             self.metadata[name] = {
                 'file_name': file_info['name'],
-                'file_type': 'Google Sheet' if file_info['mimeType'] == 'application/vnd.google-apps.spreadsheet' else file_info['name'].split('.')[-1].upper(),
+                'file_type': 'Google Sheet' if file_info['mimeType'] == SHEET_MIME else file_info['name'].split('.')[-1].upper(),
                 'is_geospatial': is_geo,
                 'crs': str(df.crs) if is_geo else None,
                 'shape': df.shape,
@@ -560,20 +1358,30 @@ class GDriveWarehouse:
         
         file_info = file_index[name]
         
-        # Remove do cache se force_refresh
+        # Remove dos caches (memória e disco) e atualiza o modifiedTime se force_refresh
         if force_refresh:
-            cache_key = f"{file_info['id']}_{sheet_name if sheet_name else self.sheet_name}"
-            if cache_key in self._cache:
-                del self._cache[cache_key]
+            cache_key = self._cache_key(file_info['id'], sheet_name)
+            self._cache.pop(cache_key, None)
+            self._delete_disk_cache(cache_key, file_info['id'])
+            self._refresh_modified_times([file_info['id']])
         
-        # Lê o arquivo
-        df = self._read_file(file_info, sheet_name=sheet_name)
+        return self._load_table(name, file_info, sheet_name=sheet_name)
+    
+    def _load_table(
+        self,
+        name: str,
+        file_info: Dict,
+        sheet_name: Union[str, int, None] = None,
+        buffer: Optional[io.BytesIO] = None
+    ) -> Optional[pd.DataFrame]:
+        """Lê o arquivo de uma tabela e atualiza seus metadados."""
+        df = self._read_file(file_info, sheet_name=sheet_name, buffer=buffer)
         
         # Atualiza metadados
         if df is not None:
             self.metadata[name] = {
                 'file_name': file_info['name'],
-                'file_type': 'Google Sheet' if file_info['mimeType'] == 'application/vnd.google-apps.spreadsheet' else file_info['name'].split('.')[-1].upper(),
+                'file_type': 'Google Sheet' if file_info['mimeType'] == SHEET_MIME else file_info['name'].split('.')[-1].upper(),
                 'shape': df.shape,
                 'columns': list(df.columns),
                 'modified_time': file_info.get('modifiedTime'),
@@ -585,25 +1393,100 @@ class GDriveWarehouse:
     def get_tables(
         self, 
         names: List[str], 
-        sheet_name: Union[str, int, None] = None
-    ) -> Dict[str, pd.DataFrame]:
+        sheet_name: Union[str, int, None] = None,
+        sheet_names: Optional[List[Union[str, int]]] = None,
+        lazy: bool = False
+    ) -> Dict[str, Union[pd.DataFrame, LazyTable, Dict[Union[str, int], Union[pd.DataFrame, LazyTable]]]]:
         """
         Retorna múltiplas tabelas de uma vez.
+        Os downloads rodam em paralelo e cada tabela é lida assim que seu download termina.
         
         Args:
             names: Lista de nomes de tabelas
             sheet_name: Nome ou índice da aba (para Excel/Sheets)
+            sheet_names: Lista de abas a ler de cada tabela (substitui sheet_name);
+                Google Sheets leem todas as abas em uma única requisição
+            lazy: Se True, retorna LazyTable sem baixar nada; cada tabela só é
+                carregada no primeiro uso (ou em .collect())
         
         Returns:
-            Dicionário {nome: DataFrame}
+            Dicionário {nome: DataFrame}, ou {nome: {aba: DataFrame}} se sheet_names for informado
+            (com lazy=True, LazyTable no lugar de DataFrame)
         """
+        file_index = self._build_file_index()
+        
+        if lazy:
+            results = {}
+            for name in names:
+                if name not in file_index:
+                    print(f"⚠️  Tabela '{name}' não encontrada")
+                    continue
+                if sheet_names is not None:
+                    results[name] = {
+                        sheet: LazyTable(self, name, file_index[name], sheet_name=sheet)
+                        for sheet in sheet_names
+                    }
+                else:
+                    results[name] = LazyTable(self, name, file_index[name], sheet_name=sheet_name)
+            return results
+        
         print(f"\n{'='*60}")
         print(f"CARREGANDO {len(names)} TABELAS")
         print(f"{'='*60}\n")
         
+        # Atualiza o modifiedTime de todas as tabelas em uma única requisição em lote
+        self._refresh_modified_times(
+            [file_index[name]['id'] for name in names if name in file_index]
+        )
+        
+        if sheet_names is not None:
+            results = {}
+            for name in names:
+                if name in file_index and file_index[name]['mimeType'] == SHEET_MIME:
+                    self._prefetch_google_sheets(file_index[name], sheet_names)
+                
+                sheets = {}
+                for sheet in sheet_names:
+                    df = self.get_table(name, sheet_name=sheet)
+                    if df is not None:
+                        sheets[sheet] = df
+                if sheets:
+                    results[name] = sheets
+            
+            print(f"{'='*60}")
+            print(f"✓ {len(results)}/{len(names)} tabelas carregadas")
+            print(f"{'='*60}\n")
+            
+            return results
+        
+        # Arquivos que precisam ser baixados
+        to_download = [
+            name for name in dict.fromkeys(names)
+            if name in file_index and self._needs_download(file_index[name], sheet_name)
+        ]
+        
+        loaded = {}
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+            futures = {
+                executor.submit(self._download_file, file_index[name]['id']): name
+                for name in to_download
+            }
+            # Lê na thread principal à medida que os downloads terminam
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    buffer = future.result()
+                except Exception as e:
+                    print(f"✗ ERRO ao baixar {file_index[name]['name']}: {str(e)}\n")
+                    loaded[name] = None
+                    continue
+                loaded[name] = self._load_table(
+                    name, file_index[name], sheet_name=sheet_name, buffer=buffer
+                )
+        
         results = {}
         for name in names:
-            df = self.get_table(name, sheet_name=sheet_name)
+            df = loaded[name] if name in loaded else self.get_table(name, sheet_name=sheet_name)
             if df is not None:
                 results[name] = df
         
@@ -662,24 +1545,36 @@ class GDriveWarehouse:
         self._cache.clear()
         self._file_index = None
         self._file_index_timestamp = None
+        self._modified_times = {}
         print("✓ Cache em memória limpo com sucesso")
     
     def get_cache_info(self) -> Dict:
-        """Retorna informações sobre o cache atual."""
+        """
+        Retorna informações sobre o cache atual.
+        'ttl_minutes' (e 'index_ttl_minutes') é o tempo de vida do índice de arquivos;
+        'cache_max_age_hours' é o prazo sem uso após o qual uma tabela sai do cache em memória.
+        """
         total_size = 0
         valid_entries = 0
         
-        for cache_key, cache_entry in self._cache.items():
+        for cache_entry in list(self._cache.values()):
             if self._is_cache_valid(cache_entry):
                 valid_entries += 1
-                df = cache_entry['df']
-                total_size += df.memory_usage(deep=True).sum() / (1024 * 1024)
+                cached = cache_entry['df']
+                if pa is not None and isinstance(cached, pa.Table):
+                    total_size += cached.nbytes / (1024 * 1024)
+                else:
+                    total_size += cached.memory_usage(deep=True).sum() / (1024 * 1024)
         
+        ttl_minutes = int(self.cache_ttl.total_seconds() // 60)
         return {
             'total_entries': len(self._cache),
             'valid_entries': valid_entries,
             'expired_entries': len(self._cache) - valid_entries,
             'estimated_size_mb': round(total_size, 2),
-            'ttl_minutes': self.cache_ttl.seconds // 60,
-            'indexed_files': len(self._file_index) if self._file_index else 0
+            'ttl_minutes': ttl_minutes,
+            'index_ttl_minutes': ttl_minutes,
+            'cache_max_age_hours': CACHE_MAX_AGE.total_seconds() / 3600,
+            'indexed_files': len(self._file_index) if self._file_index else 0,
+            'disk_cache_dir': str(self.disk_cache_dir) if self.disk_cache_dir else None
         }
\ No newline at end of file